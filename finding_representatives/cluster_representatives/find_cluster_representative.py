@@ -1,9 +1,13 @@
 import argparse
+import sys
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tabular_io import read_table, write_table  # noqa: E402
+
 """
 This script identifies representative proteins for each cluster by
 finding the protein that has the highest TM-score average in each cluster,
@@ -12,38 +16,55 @@ The cluster labels are in the leiden_features.tsv file, which is an output
 of ProteinCartography. The similarity matrix is also an output file of
 ProteinCartography called all_by_all_tmscore_pivoted.tsv. Both of these
 input files for this analysis are provided in this repository under the
-/subclustering/input_files/ folder.
+/subclustering/input_files/ folder. Both inputs can also be given as Parquet or
+Arrow files (see ../convert_tables.py), and the output table can be written in
+either of these formats with --output-format.
 
 Usage:
 cd finding_representatives/cluster_representatives/
 python find_cluster_representatives.py \
 --matrix-tsv ../input_files/all_by_all_tmscore_pivoted.tsv \
 --cluster-tsv ../input_files/leiden_features.tsv \
---output-folder data_folder/
+--output-folder data_folder/ \
+--output-format tsv
 
 The first draft of this script was prepared with chatGPT.
 """
 
 
+OUTPUT_EXTENSIONS = {
+    "tsv": ".tsv",
+    "parquet": ".parquet",
+    "arrow": ".arrow",
+}
+
+
 def parse_args():
     parser = argparse.ArgumentParser()
     parser.add_argument(
         "-m",
         "--matrix-tsv",
         required=True,
-        help="Path to the TSV file containing the comparison matrix.",
+        help="Path to the TSV, Parquet or Arrow file containing the comparison matrix.",
     )
     parser.add_argument(
         "-c",
         "--cluster-tsv",
         required=True,
-        help="Path to the TSV file containing the cluster labels.",
+        help="Path to the TSV, Parquet or Arrow file containing the cluster labels.",
     )
     parser.add_argument(
         "-o",
         "--output-folder",
         required=True,
-        help="Path to the folder for the output TSV files.",
+        help="Path to the folder for the output files.",
+    )
+    parser.add_argument(
+        "-f",
+        "--output-format",
+        choices=OUTPUT_EXTENSIONS.keys(),
+        default="tsv",
+        help="Format of the output files (default: tsv).",
     )
     args = parser.parse_args()
     return args
@@ -69,21 +90,21 @@ def find_highest(row_means):
 
 
 def read_matrix(matrix_tsv):
-    df = pd.read_csv(matrix_tsv, sep="\t", index_col=0)
+    df = read_table(matrix_tsv, index_col=0)
     return df
 
 
 def read_clusters(cluster_tsv):
-    cluster_df = pd.read_csv(cluster_tsv, sep="\t")
+    cluster_df = read_table(cluster_tsv)
     clusters = {}
     for cluster in sorted(cluster_df["LeidenCluster"].unique()):
         clusters[cluster] = cluster_df[cluster_df["LeidenCluster"] == cluster]["protid"].tolist()
     return clusters
 
 
-def write_tsv(output_folder, filename, data, columns):
+def write_output(output_folder, filename, data, columns):
     df = pd.DataFrame(data, columns=columns)
-    df.to_csv(output_folder / filename, sep="\t", index=False)
+    write_table(df, output_folder / filename)
 
 
 def compute_results(args):
@@ -122,9 +143,9 @@ def compute_results(args):
     output_folder = Path(args.output_folder)
     output_folder.mkdir(parents=True, exist_ok=True)
 
-    write_tsv(
+    write_output(
         output_folder,
-        "cluster_representatives.tsv",
+        f"cluster_representatives{OUTPUT_EXTENSIONS[args.output_format]}",
         combined_data,
         [
             "Cluster",
@@ -0,0 +1,49 @@
+import argparse
+
+from tabular_io import read_table, write_table
+
+"""
+This script converts the ProteinCartography output tables used in this repository between
+tab-separated text and columnar formats (Parquet or Arrow IPC/Feather). The input and output
+formats are detected from the file extensions (see tabular_io.py). Converting the large
+all_by_all_tmscore_pivoted.tsv matrix once avoids parsing its float text on every run of the
+scripts in the finding_representatives folder.
+
+Usage:
+cd finding_representatives/
+python convert_tables.py \
+--input-file input_files/all_by_all_tmscore_pivoted.tsv \
+--output-file input_files/all_by_all_tmscore_pivoted.arrow
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-i",
+        "--input-file",
+        required=True,
+        help="Path to the input table (.tsv, .txt, .parquet, .pq, .feather, .arrow or .ipc).",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-file",
+        required=True,
+        help="Path to the output table (.tsv, .txt, .parquet, .pq, .feather, .arrow or .ipc).",
+    )
+    args = parser.parse_args()
+    return args
+
+
+def convert_table(input_file, output_file):
+    df = read_table(input_file)
+    write_table(df, output_file)
+
+
+def main():
+    args = parse_args()
+    convert_table(args.input_file, args.output_file)
+
+
+if __name__ == "__main__":
+    main()
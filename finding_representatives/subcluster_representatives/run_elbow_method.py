@@ -1,4 +1,5 @@
 import argparse
+import sys
 from pathlib import Path
 
 import arcadia_pycolor as apc
@@ -6,16 +7,24 @@ import matplotlib.pyplot as plt
 import pandas as pd
 from kneed import KneeLocator
 from sklearn.cluster import KMeans
+from subcluster_metrics import METRICS_COLUMNS, compute_subcluster_metrics
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tabular_io import read_table, write_table  # noqa: E402
 
 """
 This script splits a similarity matrix into sub-matrices based on cluster labels from
 the ProteinCartography output file, leiden_features.tsv. The similarity matrix is also an
 output file of ProteinCartography called all_by_all_tmscore_pivoted.tsv. Both of these
 input files are provided in this repository under the /subclustering/input_files/ folder.
+Both inputs can also be given as Parquet or Arrow files (see ../convert_tables.py).
 
 The script also passes each sub-matrix through a k-means clustering algorithm to determine the
 optimal number of clusters using the Elbow method. The Elbow plot and the optimal number of
-clusters for each sub-matrix are saved as output files.
+clusters for each sub-matrix are saved as output files. Optionally, cluster-quality metrics
+(mean internal and external TM-scores and mean silhouette score) are computed for the k-means
+clusters of every tested k from the same sub-matrices and saved to a single table
+(see subcluster_metrics.py).
 
 Usage:
 cd finding_representatives/subcluster_representatives/
@@ -23,7 +32,8 @@ python run_elbow_method.py \
 --matrix-tsv ../input_files/all_by_all_tmscore_pivoted.tsv \
 --cluster-tsv ../input_files/leiden_features.tsv \
 --plot-folder plots_folder/ \
---output-folder data_folder/
+--output-folder data_folder/ \
+--metrics-file data_folder/elbow_metrics.tsv
 
 The first draft of this script was prepared with chatGPT.
 """
@@ -35,13 +45,13 @@ def parse_args():
         "-m",
         "--matrix-tsv",
         required=True,
-        help="Path to the TSV file containing the similarity matrix.",
+        help="Path to the TSV, Parquet or Arrow file containing the similarity matrix.",
     )
     parser.add_argument(
         "-c",
         "--cluster-tsv",
         required=True,
-        help="Path to the TSV file containing the cluster labels.",
+        help="Path to the TSV, Parquet or Arrow file containing the cluster labels.",
     )
     parser.add_argument(
         "-p",
@@ -62,14 +72,16 @@ def parse_args():
         default=10,
         help="Maximum number of clusters to test (default: 10).",
     )
+    parser.add_argument(
+        "-q",
+        "--metrics-file",
+        default=None,
+        help="Optional path to the output file with quality metrics for each tested k.",
+    )
     args = parser.parse_args()
     return args
 
 
-def load_tsv(file_path, index_col=None):
-    return pd.read_csv(file_path, sep="\t", index_col=index_col)
-
-
 def split_matrix_by_cluster(matrix_df, cluster_df):
     unique_clusters = cluster_df["LeidenCluster"].unique()
     sub_matrices = {}
@@ -82,7 +94,7 @@ def split_matrix_by_cluster(matrix_df, cluster_df):
     return sub_matrices
 
 
-def elbow_method(matrix, max_k, plot_file, output_file):
+def elbow_method(matrix, max_k, plot_file, output_file, metrics_rows=None):
     distortions = []
     K = range(1, max_k + 1)
 
@@ -91,6 +103,10 @@ def elbow_method(matrix, max_k, plot_file, output_file):
         kmeans.fit(matrix)
         distortions.append(kmeans.inertia_)
 
+        if metrics_rows is not None:
+            for row in compute_subcluster_metrics(matrix, kmeans.labels_):
+                metrics_rows.append({"NumKMeansClusters": k, **row})
+
     kneedle = KneeLocator(K, distortions, curve="convex", direction="decreasing")
     optimal_k = kneedle.elbow
 
@@ -115,9 +131,11 @@ def elbow_method(matrix, max_k, plot_file, output_file):
     return optimal_k
 
 
-def process_sub_matrices(matrix_tsv, cluster_tsv, plot_folder, output_folder, max_k):
-    matrix_df = load_tsv(matrix_tsv, index_col=0)
-    cluster_df = load_tsv(cluster_tsv, index_col=0)
+def process_sub_matrices(
+    matrix_tsv, cluster_tsv, plot_folder, output_folder, max_k, metrics_file=None
+):
+    matrix_df = read_table(matrix_tsv, index_col=0)
+    cluster_df = read_table(cluster_tsv, index_col=0)
 
     matrix_df.index.name = None
     matrix_df.columns.name = None
@@ -127,10 +145,19 @@ def process_sub_matrices(matrix_tsv, cluster_tsv, plot_folder, output_folder, ma
     Path(plot_folder).mkdir(parents=True, exist_ok=True)
     Path(output_folder).mkdir(parents=True, exist_ok=True)
 
+    metrics_rows = []
+
     for cluster, sub_matrix in sub_matrices.items():
         plot_file = Path(plot_folder) / f"{cluster}.svg"
         output_file = Path(output_folder) / f"{cluster}.txt"
-        elbow_method(sub_matrix, max_k, plot_file, output_file)
+        cluster_metrics = [] if metrics_file is not None else None
+        elbow_method(sub_matrix, max_k, plot_file, output_file, cluster_metrics)
+
+        if cluster_metrics is not None:
+            metrics_rows.extend({"LeidenCluster": cluster, **row} for row in cluster_metrics)
+
+    if metrics_file is not None:
+        write_table(pd.DataFrame(metrics_rows, columns=METRICS_COLUMNS), metrics_file)
 
 
 if __name__ == "__main__":
@@ -141,4 +168,5 @@ if __name__ == "__main__":
         args.plot_folder,
         args.output_folder,
         args.max_k,
+        args.metrics_file,
     )
@@ -1,8 +1,14 @@
 import argparse
+import sys
+from pathlib import Path
 
 import numpy as np
 import pandas as pd
 from sklearn.cluster import KMeans
+from subcluster_metrics import METRICS_COLUMNS, compute_subcluster_metrics
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from tabular_io import detect_format, read_table, write_table  # noqa: E402
 
 """
 This script processes a similarity matrix file and a ProteinCartography cluster file to perform
@@ -10,20 +16,30 @@ k-means clustering on each cluster. The script identifies the protein with the h
 TM-score for each k-means cluster. The cluster labels are provided with the leiden_features.tsv
 file, which is an output of ProteinCartography. The comparison matrix is also an output file of
 ProteinCartography called all_by_all_tmscore_pivoted.tsv. Both of these input files are provided
-in this repository under the /subclustering/input_files/ folder.
+in this repository under the /subclustering/input_files/ folder. Both inputs can also be given
+as Parquet or Arrow files (see ../convert_tables.py).
 
-The output consists of two TSV files:
+The output consists of two files:
 1. A file displaying the protein with the highest average TM-score for each cluster.
 2. A file organizing the proteins in each k-means cluster under their respective Leiden clusters
    and k-means clusters.
 
+The format of each output file is detected from its extension. When the second file is written
+as Parquet or Arrow, it is stored as a long table with one row per protein instead of one
+column per k-means cluster.
+
+Optionally, cluster-quality metrics for each k-means cluster (mean internal and external TM-scores
+and mean silhouette score) are computed from the same sub-matrices and saved to a third file
+(see subcluster_metrics.py).
+
 Usage:
 cd finding_representatives/subcluster_representatives/
 python run_k_means_clustering.py \
 --matrix-tsv ../input_files/all_by_all_tmscore_pivoted.tsv \
 --cluster-tsv ../input_files/leiden_features.tsv \
 --output-file1 representatives.tsv \
---output-file2 kclusters.tsv
+--output-file2 kclusters.tsv \
+--metrics-file kmetrics.tsv
 """
 
 
@@ -33,33 +49,39 @@ def parse_args():
         "-m",
         "--matrix-tsv",
         required=True,
-        help="Path to the TSV file containing the comparison matrix.",
+        help="Path to the TSV, Parquet or Arrow file containing the comparison matrix.",
     )
     parser.add_argument(
         "-c",
         "--cluster-tsv",
         required=True,
-        help="Path to the TSV file containing the cluster labels.",
+        help="Path to the TSV, Parquet or Arrow file containing the cluster labels.",
     )
     parser.add_argument(
         "-o",
         "--output-file1",
         required=True,
-        help="Path to output TSV file with highest average TM-scores and corresponding proteins.",
+        help="Path to output file with highest average TM-scores and corresponding proteins.",
     )
     parser.add_argument(
         "-e",
         "--output-file2",
         required=True,
-        help="Path to the output TSV file showing the proteins in each k-means cluster.",
+        help="Path to the output file showing the proteins in each k-means cluster.",
+    )
+    parser.add_argument(
+        "-q",
+        "--metrics-file",
+        default=None,
+        help="Optional path to the output file with quality metrics for each k-means cluster.",
     )
     args = parser.parse_args()
     return args
 
 
-def run_kmeans_clustering(matrix_tsv, cluster_tsv, output_file1, output_file2):
-    df_matrix = pd.read_csv(matrix_tsv, sep="\t", index_col=0)
-    df_leiden = pd.read_csv(cluster_tsv, sep="\t")
+def run_kmeans_clustering(matrix_tsv, cluster_tsv, output_file1, output_file2, metrics_file=None):
+    df_matrix = read_table(matrix_tsv, index_col=0)
+    df_leiden = read_table(cluster_tsv)
 
     leiden_groups = df_leiden.groupby("LeidenCluster")
     output_columns = [
@@ -73,6 +95,7 @@ def run_kmeans_clustering(matrix_tsv, cluster_tsv, output_file1, output_file2):
     headers_lc = []
     headers_kc = []
     data = []
+    metrics_rows = []
 
     cluster_count = 3  # Number of k-means clusters
 
@@ -83,6 +106,12 @@ def run_kmeans_clustering(matrix_tsv, cluster_tsv, output_file1, output_file2):
         kmeans.fit(protein_df)
         clusters = kmeans.labels_
 
+        if metrics_file is not None:
+            for row in compute_subcluster_metrics(protein_df.values, clusters):
+                metrics_rows.append(
+                    {"LeidenCluster": leiden_cluster, "NumKMeansClusters": cluster_count, **row}
+                )
+
         rows_to_append = []
 
         for i in range(cluster_count):
@@ -105,7 +134,24 @@ def run_kmeans_clustering(matrix_tsv, cluster_tsv, output_file1, output_file2):
 
         output_df = pd.concat([output_df, pd.DataFrame(rows_to_append)], ignore_index=True)
 
-    output_df.to_csv(output_file1, sep="\t", index=False)
+    write_table(output_df, output_file1)
+
+    if metrics_file is not None:
+        write_table(pd.DataFrame(metrics_rows, columns=METRICS_COLUMNS), metrics_file)
+
+    if detect_format(output_file2) != "tsv":
+        membership_df = pd.DataFrame(
+            [
+                [leiden_cluster, kmeans_cluster, protein]
+                for leiden_cluster, kmeans_cluster, proteins in zip(
+                    headers_lc, headers_kc, data, strict=True
+                )
+                for protein in proteins
+            ],
+            columns=["LeidenCluster", "KMeansCluster", "protid"],
+        )
+        write_table(membership_df, output_file2)
+        return
 
     with open(output_file2, "w") as f:
         f.write("\t".join(headers_lc) + "\n")
@@ -118,7 +164,13 @@ def run_kmeans_clustering(matrix_tsv, cluster_tsv, output_file1, output_file2):
 
 def main():
     args = parse_args()
-    run_kmeans_clustering(args.matrix_tsv, args.cluster_tsv, args.output_file1, args.output_file2)
+    run_kmeans_clustering(
+        args.matrix_tsv,
+        args.cluster_tsv,
+        args.output_file1,
+        args.output_file2,
+        args.metrics_file,
+    )
 
 
 if __name__ == "__main__":
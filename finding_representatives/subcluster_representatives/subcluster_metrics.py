@@ -0,0 +1,94 @@
+import numpy as np
+
+"""
+This module computes cluster-quality metrics for the k-means subclusters of a Leiden cluster
+directly from the TM-score sub-matrix that the subclustering scripts already hold in memory.
+For each k-means subcluster, it reports:
+- the mean TM-score between the proteins of the subcluster (self-comparisons excluded),
+- the mean TM-score between the proteins of the subcluster and those of the other subclusters,
+- the mean silhouette score of its proteins, computed from 1 - TM-score distances.
+
+All metrics are accumulated in a single pass over blocks of rows of the sub-matrix, so no
+n x n temporary (such as a full distance matrix) is created. The metrics are written by
+run_elbow_method.py and run_k_means_clustering.py when they are given a --metrics-file.
+"""
+
+METRICS_COLUMNS = [
+    "LeidenCluster",
+    "NumKMeansClusters",
+    "KMeansCluster",
+    "NumProteins",
+    "MeanInternalTMScore",
+    "MeanExternalTMScore",
+    "MeanSilhouette",
+]
+
+
+def compute_subcluster_metrics(matrix, labels, chunk_size=1024):
+    matrix = np.asarray(matrix, dtype=float)
+    cluster_ids, cluster_index = np.unique(labels, return_inverse=True)
+    n_proteins = len(cluster_index)
+    n_clusters = len(cluster_ids)
+
+    membership = np.zeros((n_proteins, n_clusters))
+    membership[np.arange(n_proteins), cluster_index] = 1.0
+    counts = membership.sum(axis=0)
+    self_scores = np.diagonal(matrix)
+
+    # Sums of TM-scores from the proteins of each cluster (rows) to each cluster (columns)
+    tm_sums = np.zeros((n_clusters, n_clusters))
+    silhouettes = np.full(n_proteins, np.nan)
+
+    for start in range(0, n_proteins, chunk_size):
+        stop = min(start + chunk_size, n_proteins)
+        block_sums = matrix[start:stop] @ membership
+        tm_sums += membership[start:stop].T @ block_sums
+
+        if n_clusters < 2:
+            continue
+
+        rows = np.arange(stop - start)
+        own = cluster_index[start:stop]
+        own_counts = counts[own]
+
+        # Distances are 1 - TM-score, so their sums follow from the TM-score sums
+        distance_sums = counts - block_sums
+        self_distances = 1.0 - self_scores[start:stop]
+        intra = (distance_sums[rows, own] - self_distances) / np.maximum(own_counts - 1, 1)
+
+        mean_distances = distance_sums / counts
+        mean_distances[rows, own] = np.inf
+        nearest = mean_distances.min(axis=1)
+
+        denominator = np.maximum(intra, nearest)
+        scores = np.divide(
+            nearest - intra,
+            denominator,
+            out=np.zeros_like(intra),
+            where=denominator > 0,
+        )
+        # Silhouette scores of proteins in singleton clusters are 0 by convention
+        scores[own_counts == 1] = 0.0
+        silhouettes[start:stop] = scores
+
+    diagonal_sums = np.bincount(cluster_index, weights=self_scores, minlength=n_clusters)
+
+    metrics = []
+    for i, cluster_id in enumerate(cluster_ids):
+        count = counts[i]
+        internal_pairs = count * (count - 1)
+        external_pairs = count * (n_proteins - count)
+        internal_sum = tm_sums[i, i] - diagonal_sums[i]
+        external_sum = tm_sums[i].sum() - tm_sums[i, i]
+
+        metrics.append(
+            {
+                "KMeansCluster": f"KC{cluster_id}",
+                "NumProteins": int(count),
+                "MeanInternalTMScore": internal_sum / internal_pairs if internal_pairs else np.nan,
+                "MeanExternalTMScore": external_sum / external_pairs if external_pairs else np.nan,
+                "MeanSilhouette": silhouettes[cluster_index == i].mean(),
+            }
+        )
+
+    return metrics
@@ -0,0 +1,76 @@
+from pathlib import Path
+
+import pandas as pd
+from pyarrow import feather, parquet
+
+"""
+This module provides the shared input/output helpers for the scripts in the
+finding_representatives folder. ProteinCartography writes its outputs, such as
+leiden_features.tsv and all_by_all_tmscore_pivoted.tsv, as tab-separated text.
+Parsing the float text of the large TM-score matrix is the slowest step of our runs,
+so the same tables can also be read from, and written to, columnar formats.
+
+The format of a file is detected from its extension:
+- .tsv, .txt: tab-separated text
+- .parquet, .pq: Apache Parquet
+- .feather, .arrow, .ipc: Arrow IPC (Feather V2)
+
+Arrow IPC files are written uncompressed so that they can be memory-mapped when read.
+Row indexes are always stored as the first column of a columnar file, so `index_col`
+behaves the same way for every format. Use convert_tables.py to convert the
+ProteinCartography TSV files into one of the columnar formats.
+"""
+
+FORMATS_BY_SUFFIX = {
+    ".tsv": "tsv",
+    ".txt": "tsv",
+    ".parquet": "parquet",
+    ".pq": "parquet",
+    ".feather": "feather",
+    ".arrow": "feather",
+    ".ipc": "feather",
+}
+
+
+def detect_format(file_path):
+    suffix = Path(file_path).suffix.lower()
+    if suffix not in FORMATS_BY_SUFFIX:
+        supported = ", ".join(sorted(FORMATS_BY_SUFFIX))
+        raise ValueError(
+            f"Unsupported file extension '{suffix}' for {file_path}. "
+            f"Supported extensions are: {supported}."
+        )
+    return FORMATS_BY_SUFFIX[suffix]
+
+
+def read_table(file_path, index_col=None):
+    file_format = detect_format(file_path)
+
+    if file_format == "tsv":
+        return pd.read_csv(file_path, sep="\t", index_col=index_col)
+
+    if file_format == "parquet":
+        table = parquet.read_table(file_path, memory_map=True)
+    else:
+        table = feather.read_table(file_path, memory_map=True)
+
+    df = table.to_pandas()
+    if index_col is not None:
+        df = df.set_index(df.columns[index_col])
+    return df
+
+
+def write_table(df, file_path, index=False):
+    file_format = detect_format(file_path)
+
+    if file_format == "tsv":
+        df.to_csv(file_path, sep="\t", index=index)
+        return
+
+    # Columnar formats store the index as a regular column and require string column names
+    df = df.reset_index(drop=not index).rename(columns=str)
+
+    if file_format == "parquet":
+        df.to_parquet(file_path, index=False)
+    else:
+        df.to_feather(file_path, compression="uncompressed")